@@ -1,6 +1,9 @@
+import threading
 from collections.abc import Generator
 from typing import Any
 
+from cachetools import LRUCache
+
 from datasources.utils.outline_client import OutlineClient
 from datasources.utils.outline_extractor import OutlineExtractor
 
@@ -13,12 +16,47 @@ from dify_plugin.entities.datasource import (
 from dify_plugin.interfaces.datasource.online_document import OnlineDocumentDatasource
 
 
+class _ClientCache(LRUCache):
+    """
+    LRU cache of Outline clients that closes a client's session when it is evicted.
+    """
+
+    def popitem(self) -> tuple[Any, OutlineClient]:
+        key, client = super().popitem()
+        client.close()
+        return key, client
+
+
 class OutlineDataSource(OnlineDocumentDatasource):
     """
     Outline datasource implementation for Dify.
     Provides access to documents and collections from Outline workspaces.
     """
 
+    # Clients are shared across requests so their connection pools stay warm
+    _clients: _ClientCache = _ClientCache(maxsize=32)
+    _clients_lock = threading.Lock()
+
+    @classmethod
+    def _client_for(cls, api_key: str, workspace_url: str) -> OutlineClient:
+        """
+        Get the shared client for the given credentials, creating it on first use.
+
+        Args:
+            api_key: Outline API key
+            workspace_url: Outline workspace URL
+
+        Returns:
+            OutlineClient for the given credentials
+        """
+        key = (api_key, workspace_url)
+        with cls._clients_lock:
+            client = cls._clients.get(key)
+            if client is None:
+                client = OutlineClient(api_key, workspace_url)
+                cls._clients[key] = client
+            return client
+
     def _get_pages(self, datasource_parameters: dict[str, Any]) -> DatasourceGetPagesResponse:
         """
         Get all accessible pages (documents and collections) from the Outline workspace.
@@ -39,10 +77,10 @@ class OutlineDataSource(OnlineDocumentDatasource):
         if not workspace_url:
             raise ValueError("Workspace URL not found in credentials")
 
-        # Initialize client and get workspace info
-        outline_client = OutlineClient(api_key, workspace_url)
+        # Get client and workspace info
+        outline_client = self._client_for(api_key, workspace_url)
         workspace_info = outline_client.get_workspace_info()
-        
+
         # Get all accessible pages
         pages = outline_client.get_authorized_pages()
         
@@ -85,7 +123,8 @@ class OutlineDataSource(OnlineDocumentDatasource):
                 api_key=api_key,
                 workspace_url=workspace_url,
                 page_id=page.page_id,
-                page_type=page.type
+                page_type=page.type,
+                client=self._client_for(api_key, workspace_url),
             )
             
             # Extract content
@@ -3,14 +3,40 @@ Outline API Client for Dify plugins
 This module provides a unified interface for interacting with the Outline API
 """
 
+import random
+import threading
 import time
+from collections import deque
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+import orjson
 import requests
+from cachetools import LRUCache, TTLCache, cached
+from cachetools.keys import hashkey
+from requests.adapters import HTTPAdapter
 
 from dify_plugin.entities.datasource import OnlineDocumentPage
 
 __TIMEOUT_SECONDS__ = 60 * 10
+__MAX_WORKERS__ = 8
+
+# Stop calling the API for a while once it keeps failing, instead of piling up retries
+__CIRCUIT_FAILURE_THRESHOLD__ = 10
+__CIRCUIT_FAILURE_WINDOW_SECONDS__ = 30
+__CIRCUIT_COOLDOWN_SECONDS__ = 15
+
+# Workspace and collection metadata rarely changes, document content changes more often
+_metadata_cache: TTLCache = TTLCache(maxsize=256, ttl=300)
+_document_cache: TTLCache = TTLCache(maxsize=256, ttl=60)
+# Keyed by the document's updatedAt, so entries never go stale and only need size-based eviction
+_document_version_cache: LRUCache = LRUCache(maxsize=1024)
+_cache_lock = threading.Lock()
+
+
+def _client_key(client: "OutlineClient", *args: Any) -> tuple:
+    return hashkey(client.api_key, client.workspace_url, *args)
 
 
 class OutlineClient:
@@ -19,29 +45,110 @@ class OutlineClient:
     Abstracts the API calls and provides a unified interface for all Outline operations.
     """
 
-    def __init__(self, api_key: str, workspace_url: str):
+    def __init__(
+        self,
+        api_key: str,
+        workspace_url: str,
+        max_retries: int = 3,
+        backoff_factor: float = 1.0,
+        backoff_cap: float = 30.0,
+    ):
         """
         Initialize the Outline client with an API key and workspace URL.
 
         Args:
             api_key: The Outline API key for authentication
             workspace_url: The workspace URL (e.g., https://your-team.getoutline.com)
+            max_retries: Default maximum number of retries per request
+            backoff_factor: Default backoff factor for exponential backoff
+            backoff_cap: Maximum backoff in seconds before jitter is applied
         """
         self.api_key = api_key
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_cap = backoff_cap
         self.workspace_url = workspace_url.rstrip("/")
         self.api_base_url = f"{self.workspace_url}/api"
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
             "Accept": "application/json",
+            # Decoded transparently by urllib3, brotli support comes from the brotli package
+            "Accept-Encoding": "gzip, br",
         }
 
+        # Reuse connections across calls (HTTP keep-alive), with room for every worker thread
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=max(20, __MAX_WORKERS__), max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Circuit breaker state: timestamps of recent failed calls and when the circuit opened
+        self._fail_window: deque[float] = deque(maxlen=20)
+        self._circuit_opened_at: float | None = None
+        self._circuit_lock = threading.Lock()
+
+    def __enter__(self) -> "OutlineClient":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the underlying HTTP session and release its pooled connections.
+        """
+        self.session.close()
+
+    @staticmethod
+    def invalidate() -> None:
+        """
+        Clear all cached API responses.
+        """
+        _metadata_cache.clear()
+        _document_cache.clear()
+        _document_version_cache.clear()
+
+    def _check_circuit(self) -> None:
+        """
+        Fail fast while the circuit is open.
+
+        Raises:
+            ValueError: If too many requests failed recently and the cool-down has not passed
+        """
+        with self._circuit_lock:
+            if (
+                self._circuit_opened_at is not None
+                and time.monotonic() - self._circuit_opened_at < __CIRCUIT_COOLDOWN_SECONDS__
+            ):
+                raise ValueError("Outline API circuit open, too many recent request failures")
+
+    def _record_failure(self) -> None:
+        """
+        Record a request that failed after all retries and open the circuit once the failure threshold is reached.
+        """
+        with self._circuit_lock:
+            now = time.monotonic()
+            self._fail_window.append(now)
+            recent = sum(1 for failed_at in self._fail_window if now - failed_at <= __CIRCUIT_FAILURE_WINDOW_SECONDS__)
+            if recent >= __CIRCUIT_FAILURE_THRESHOLD__:
+                self._circuit_opened_at = now
+
+    def _record_success(self) -> None:
+        """
+        Close the circuit and forget previous failures.
+        """
+        with self._circuit_lock:
+            self._fail_window.clear()
+            self._circuit_opened_at = None
+
     def _make_request(
         self,
         endpoint: str,
         data: dict[str, Any] | None = None,
-        max_retries: int = 3,
-        backoff_factor: float = 1.0,
+        max_retries: int | None = None,
+        backoff_factor: float | None = None,
     ) -> dict[str, Any]:
         """
         Make a POST request to the Outline API with retry logic.
@@ -49,25 +156,32 @@ class OutlineClient:
         Args:
             endpoint: The API endpoint (e.g., 'documents.list')
             data: JSON data to send in the request body
-            max_retries: Maximum number of retries
-            backoff_factor: Backoff factor for exponential backoff
+            max_retries: Maximum number of retries, defaults to the client setting
+            backoff_factor: Backoff factor for exponential backoff, defaults to the client setting
 
         Returns:
             The JSON response from the API
 
         Raises:
             requests.exceptions.RequestException: If the request fails after all retries
-            ValueError: If the API returns an error response
+            ValueError: If the API returns an error response or the circuit is open
         """
         url = f"{self.api_base_url}/{endpoint}"
         request_data = data or {}
+        if max_retries is None:
+            max_retries = self.max_retries
+        if backoff_factor is None:
+            backoff_factor = self.backoff_factor
+
+        # Checked once per call so a retry sequence that already started can finish
+        self._check_circuit()
 
         for attempt in range(max_retries + 1):
             try:
-                response = requests.post(
+                # Content-Type is already set on the session headers
+                response = self.session.post(
                     url,
-                    headers=self.headers,
-                    json=request_data,
+                    data=orjson.dumps(request_data),
                     timeout=__TIMEOUT_SECONDS__,
                 )
 
@@ -80,29 +194,50 @@ class OutlineClient:
                         raise requests.exceptions.RequestException("Rate limit exceeded")
 
                 response.raise_for_status()
-                response_json = response.json()
+                try:
+                    response_json = orjson.loads(response.content)
+                except orjson.JSONDecodeError as e:
+                    # Keep non-JSON responses (e.g. an HTML page from a proxy) on the retryable error path
+                    raise requests.exceptions.InvalidJSONError(f"Invalid JSON response: {str(e)}") from e
 
                 if not response_json.get("ok", False):
                     error_message = response_json.get("error", "Unknown API error")
                     raise ValueError(f"Outline API error: {error_message}")
 
+                self._record_success()
                 return response_json
 
             except requests.exceptions.RequestException as e:
                 if attempt < max_retries:
-                    wait_time = backoff_factor * (2**attempt)
+                    # Capped exponential backoff with jitter so concurrent retries don't line up
+                    wait_time = min(self.backoff_cap, backoff_factor * (2**attempt)) * random.uniform(0.5, 1.5)
                     time.sleep(wait_time)
                     continue
                 else:
+                    # Count the call once its retries are used up, client errors such as a missing
+                    # document say nothing about the API's health
+                    if e.response is None or e.response.status_code >= 500:
+                        self._record_failure()
                     raise e
 
         # This should never be reached, but just in case
         raise requests.exceptions.RequestException("Max retries exceeded")
 
+    @cached(_metadata_cache, key=lambda self: _client_key(self, "auth.info"), lock=_cache_lock)
     def get_auth_info(self) -> dict[str, Any]:
         """
         Get authentication information and user details.
 
+        Returns:
+            Dictionary containing user and team information
+        """
+        return self.get_auth_info_uncached()
+
+    def get_auth_info_uncached(self) -> dict[str, Any]:
+        """
+        Get authentication information and user details, always asking the server.
+        Use this to check credentials, a cached response could hide a revoked API key.
+
         Returns:
             Dictionary containing user and team information
         """
@@ -130,6 +265,7 @@ class OutlineClient:
 
         return self._make_request("documents.list", data)
 
+    @cached(_document_cache, key=lambda self, document_id: _client_key(self, "documents.info", document_id), lock=_cache_lock)
     def get_document_info(self, document_id: str) -> dict[str, Any]:
         """
         Get detailed information about a specific document.
@@ -142,6 +278,25 @@ class OutlineClient:
         """
         return self._make_request("documents.info", {"id": document_id})
 
+    @cached(
+        _document_version_cache,
+        key=lambda self, document_id, updated_at: _client_key(self, "documents.info", document_id, updated_at),
+        lock=_cache_lock,
+    )
+    def get_document_info_cached(self, document_id: str, updated_at: str) -> dict[str, Any]:
+        """
+        Get detailed information about a specific document, cached per document version.
+
+        Args:
+            document_id: The ID of the document to retrieve
+            updated_at: The document's updatedAt timestamp as returned by a listing
+
+        Returns:
+            Dictionary containing document information
+        """
+        # Bypass the TTL cache so a stale response is never stored under a newer version
+        return self._make_request("documents.info", {"id": document_id})
+
     def list_collections(self, limit: int = 25, offset: int = 0) -> dict[str, Any]:
         """
         List collections in the workspace.
@@ -160,6 +315,7 @@ class OutlineClient:
 
         return self._make_request("collections.list", data)
 
+    @cached(_metadata_cache, key=lambda self, collection_id: _client_key(self, "collections.info", collection_id), lock=_cache_lock)
     def get_collection_info(self, collection_id: str) -> dict[str, Any]:
         """
         Get detailed information about a specific collection.
@@ -192,6 +348,81 @@ class OutlineClient:
 
         return self._make_request("documents.search", data)
 
+    def _iter_document_batches(
+        self, docs_response: dict[str, Any], limit: int = 100
+    ) -> Generator[list[dict[str, Any]], None, None]:
+        """
+        Iterate over all documents in the workspace, one page of results at a time.
+
+        Args:
+            docs_response: Response of the first documents.list page (offset 0), used to learn the total count
+            limit: Number of documents requested per page
+
+        Yields:
+            Lists of documents, in listing order, as soon as each page is available
+        """
+        documents = docs_response.get("data", [])
+        yield documents
+        total = docs_response.get("pagination", {}).get("total")
+
+        if total is not None:
+            # Fetch the remaining pages concurrently, yielding them in order as they complete
+            offsets = range(limit, total, limit)
+            with ThreadPoolExecutor(max_workers=__MAX_WORKERS__) as executor:
+                for response in executor.map(lambda offset: self.list_documents(limit=limit, offset=offset), offsets):
+                    yield response.get("data", [])
+        else:
+            # Older Outline versions don't report a total, so probe a window of pages concurrently
+            # and stop at the first short page
+            offset = limit
+            window = limit * __MAX_WORKERS__
+            with ThreadPoolExecutor(max_workers=__MAX_WORKERS__) as executor:
+                while len(documents) == limit:
+                    offsets = range(offset, offset + window, limit)
+                    for response in executor.map(lambda offset: self.list_documents(limit=limit, offset=offset), offsets):
+                        documents = response.get("data", [])
+                        yield documents
+                        if len(documents) < limit:
+                            break
+                    offset += window
+
+    def iter_authorized_pages(self) -> Generator[OnlineDocumentPage, None, None]:
+        """
+        Iterate over all authorized pages (documents and collections) that can be accessed.
+
+        Yields:
+            OnlineDocumentPage objects as soon as the page of results containing them arrives
+        """
+        # Collections and the first page of documents are independent, so fetch them together
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            collections_future = executor.submit(self.list_collections, limit=100)  # Get more collections at once
+            first_docs_future = executor.submit(self.list_documents, limit=100, offset=0)
+
+        collections = collections_future.result().get("data", [])
+
+        for collection in collections:
+            # Add collection as a page
+            yield OnlineDocumentPage(
+                page_id=collection["id"],
+                page_name=collection["name"],
+                page_icon={"type": "emoji", "emoji": collection.get("emoji", "🔹")},
+                type="collection",
+                url=f"{self.workspace_url}/collection/{collection['id']}",
+                last_edited_time=collection["updatedAt"],
+            )
+
+        for documents in self._iter_document_batches(first_docs_future.result(), limit=100):
+            for doc in documents:
+                yield OnlineDocumentPage(
+                    page_id=doc["id"],
+                    page_name=doc["title"],
+                    page_icon={"type": "emoji", "emoji": doc["emoji"]} if doc.get("emoji") else None,
+                    parent_id=doc.get("parentDocumentId") if doc.get("parentDocumentId") else doc.get("collectionId"),
+                    type="document",
+                    url=doc.get("url", f"{self.workspace_url}/doc/{doc['urlId']}"),
+                    last_edited_time=doc["updatedAt"],
+                )
+
     def get_authorized_pages(self) -> list[OnlineDocumentPage]:
         """
         Get all authorized pages (documents and collections) that can be accessed.
@@ -199,57 +430,11 @@ class OutlineClient:
         Returns:
             List of OnlineDocumentPage objects representing accessible documents
         """
-        pages = []
-
         try:
-            # Get all collections first
-            collections_response = self.list_collections(limit=100)  # Get more collections at once
-            collections = collections_response.get("data", [])
-
-            for collection in collections:
-                # Add collection as a page
-                pages.append(
-                    OnlineDocumentPage(
-                        page_id=collection["id"],
-                        page_name=collection["name"],
-                        page_icon={"type": "emoji", "emoji": collection.get("emoji", "🔹")},
-                        type="collection",
-                        url=f"{self.workspace_url}/collection/{collection['id']}",
-                        last_edited_time=collection["updatedAt"],
-                    )
-                )
-
-            # Get all documents
-            offset = 0
-            limit = 100
-            while True:
-                docs_response = self.list_documents(limit=limit, offset=offset)
-                documents = docs_response.get("data", [])
-                if not documents:
-                    break
-
-                for doc in documents:
-                    pages.append(
-                        OnlineDocumentPage(
-                            page_id=doc["id"],
-                            page_name=doc["title"],
-                            page_icon={"type": "emoji", "emoji": doc["emoji"]} if doc.get("emoji") else None,
-                            parent_id=doc.get("parentDocumentId") if doc.get("parentDocumentId") else doc.get("collectionId"),
-                            type="document",
-                            url=doc.get("url", f"{self.workspace_url}/doc/{doc['urlId']}"),
-                            last_edited_time=doc["updatedAt"],
-                        )
-                    )
-                # If less than limit, we've reached the last page
-                if len(documents) < limit:
-                    break
-                offset += limit
-      
+            return list(self.iter_authorized_pages())
         except Exception as e:
             raise ValueError(f"Error fetching authorized pages: {str(e)}")
 
-        return pages
-
     def get_workspace_info(self) -> dict[str, str]:
         """
         Get workspace information including name and ID.
@@ -1,7 +1,20 @@
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
-from datasources.utils.outline_client import OutlineClient
+from datasources.utils.outline_client import __MAX_WORKERS__, OutlineClient
+
+# Three or more line breaks, possibly separated by whitespace
+_MULTI_BLANK_RE = re.compile(r'\n\s*\n\s*\n+')
+# A paragraph break with whitespace on either side, the lookbehind keeps the literal '\n\n' prefix
+# so the search stays in the regex engine's fast scan
+_PARAGRAPH_EDGE_RE = re.compile(r'\n\n(?:(?<=[^\S\n]\n\n)|[^\S\n])')
+# ASCII whitespace other than spaces and line breaks, text containing any of it takes the full cleaner
+_OTHER_WHITESPACE = '\t\r\x0b\x0c\x1c\x1d\x1e\x1f'
+# With spaces as the only other whitespace, matches every run the cleaner would change: three line breaks,
+# a paragraph break with a space on either side, or three line breaks separated by spaces. Every branch
+# follows one literal '\n' so the search stays in the regex engine's fast scan
+_NEEDS_CLEANING_RE = re.compile(r'\n(?:(?<= \n)\n|\n[\n ]| +\n +\n)')
 
 
 class OutlineExtractor:
@@ -10,7 +23,9 @@ class OutlineExtractor:
     Converts Outline content to a format suitable for use in Dify.
     """
 
-    def __init__(self, api_key: str, workspace_url: str, page_id: str, page_type: str):
+    def __init__(
+        self, api_key: str, workspace_url: str, page_id: str, page_type: str, client: OutlineClient | None = None
+    ):
         """
         Initialize the extractor.
 
@@ -19,12 +34,13 @@ class OutlineExtractor:
             workspace_url: Outline workspace URL
             page_id: ID of the page (document or collection) to extract
             page_type: Type of page ('document' or 'collection')
+            client: Optional existing client to reuse, a new one is created if omitted
         """
         self.api_key = api_key
         self.workspace_url = workspace_url
         self.page_id = page_id
         self.page_type = page_type
-        self.client = OutlineClient(api_key, workspace_url)
+        self.client = client or OutlineClient(api_key, workspace_url)
 
     def extract(self) -> dict[str, Any]:
         """
@@ -66,18 +82,33 @@ class OutlineExtractor:
             text_content = doc_data.get("text", "")
             
             # Basic formatting - Outline returns plain text in the 'text' field
-            formatted_content = f"# {title}\n\n"
+            parts = [f"# {title}\n\n"]
             
             if text_content:
                 # Clean up the text content
                 cleaned_content = self._clean_text_content(text_content)
-                formatted_content += cleaned_content
+                parts.append(cleaned_content)
 
-            return formatted_content
+            return "".join(parts)
 
         except Exception as e:
             return f"Error extracting document content: {str(e)}"
 
+    def _fetch_document_info(self, doc: dict[str, Any]) -> dict[str, Any]:
+        """
+        Fetch details for a document from a listing, reusing a cached copy while it is unchanged.
+
+        Args:
+            doc: Document entry from a documents.list response
+
+        Returns:
+            Dictionary containing document information
+        """
+        updated_at = doc.get("updatedAt")
+        if updated_at:
+            return self.client.get_document_info_cached(doc.get("id", ""), updated_at)
+        return self.client.get_document_info(doc.get("id", ""))
+
     def _extract_collection_content(self, collection_id: str) -> str:
         """
         Extract content from a collection and its documents.
@@ -96,12 +127,13 @@ class OutlineExtractor:
             collection_name = collection_data.get("name", "Untitled Collection")
             collection_description = collection_data.get("description", "")
 
-            formatted_content = f"# {collection_name}\n\n"
+            # Collect fragments and join once at the end instead of repeatedly concatenating
+            parts = [f"# {collection_name}\n\n"]
             
             if collection_description:
-                formatted_content += f"{collection_description}\n\n"
+                parts.append(f"{collection_description}\n\n")
 
-            formatted_content += "---\n\n"
+            parts.append("---\n\n")
 
             # Get all documents in the collection
             try:
@@ -109,31 +141,35 @@ class OutlineExtractor:
                 documents = docs_response.get("data", [])
 
                 if documents:
-                    formatted_content += "## Documents in this Collection\n\n"
-                    
-                    for doc in documents:
+                    parts.append("## Documents in this Collection\n\n")
+
+                    with ThreadPoolExecutor(max_workers=__MAX_WORKERS__) as executor:
+                        # The listing usually includes each document's text already, only fetch the ones
+                        # without it concurrently, futures keep the listing order
+                        futures = [
+                            None if "text" in doc else executor.submit(self._fetch_document_info, doc)
+                            for doc in documents
+                        ]
+
+                    for doc, future in zip(documents, futures):
                         doc_title = doc.get("title", "Untitled Document")
-                        doc_id = doc.get("id", "")
                         
-                        formatted_content += f"### {doc_title}\n\n"
+                        parts.append(f"### {doc_title}\n\n")
                         
-                        # Extract document content
+                        # A failing document only affects its own section
                         try:
-                            doc_content = self._extract_document_content(doc_id)
-                            # Remove the title from the document content since we already added it
-                            doc_content_lines = doc_content.split('\n', 2)
-                            if len(doc_content_lines) > 2:
-                                doc_content = doc_content_lines[2]
-                            formatted_content += doc_content + "\n\n"
+                            doc_data = doc if future is None else future.result().get("data", {})
+                            doc_content = self._clean_text_content(doc_data.get("text", ""))
+                            parts.append(doc_content + "\n\n")
                         except Exception as e:
-                            formatted_content += f"*Error loading document content: {str(e)}*\n\n"
+                            parts.append(f"*Error loading document content: {str(e)}*\n\n")
                 else:
-                    formatted_content += "*No documents found in this collection*\n\n"
+                    parts.append("*No documents found in this collection*\n\n")
 
             except Exception as e:
-                formatted_content += f"*Error loading collection documents: {str(e)}*\n\n"
+                parts.append(f"*Error loading collection documents: {str(e)}*\n\n")
 
-            return formatted_content
+            return "".join(parts)
 
         except Exception as e:
             return f"Error extracting collection content: {str(e)}"
@@ -151,17 +187,24 @@ class OutlineExtractor:
         if not text:
             return ""
 
+        # Already clean text (the common case, Outline's editor normalizes whitespace) is returned as is.
+        # The cheap str probes go first, anything they can't rule out falls through to the full cleaner
+        if (
+            text.isascii()
+            and not text[0].isspace()
+            and not text[-1].isspace()
+            and not any(char in text for char in _OTHER_WHITESPACE)
+            and not _NEEDS_CLEANING_RE.search(text)
+        ):
+            return text
+
         # Remove excessive whitespace while preserving paragraph breaks
-        cleaned = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)
-        
-        # Remove leading/trailing whitespace
-        cleaned = cleaned.strip()
-        
-        # Ensure proper line breaks for readability
-        if cleaned:
-            # Split into paragraphs and rejoin with consistent spacing
-            paragraphs = [p.strip() for p in cleaned.split('\n\n') if p.strip()]
-            cleaned = '\n\n'.join(paragraphs)
+        cleaned = _MULTI_BLANK_RE.sub('\n\n', text).strip()
+
+        # Only split into paragraphs when some paragraph has surrounding whitespace to strip,
+        # after the collapse above there are no empty paragraphs left to drop
+        if _PARAGRAPH_EDGE_RE.search(cleaned):
+            cleaned = '\n\n'.join(filter(None, map(str.strip, cleaned.split('\n\n'))))
 
         return cleaned
 
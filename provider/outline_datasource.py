@@ -2,11 +2,11 @@ from typing import Any
 
 import requests
 
+from datasources.utils.outline_client import OutlineClient
+
 from dify_plugin.errors.tool import ToolProviderCredentialValidationError
 from dify_plugin.interfaces.datasource import DatasourceProvider
 
-__TIMEOUT_SECONDS__ = 60 * 10
-
 
 class OutlineDatasourceProvider(DatasourceProvider):
     def _validate_credentials(self, credentials: dict[str, Any]) -> None:
@@ -33,40 +33,27 @@ class OutlineDatasourceProvider(DatasourceProvider):
             raise ToolProviderCredentialValidationError("Workspace URL must start with http:// or https://")
         
         try:
-            # Test the API key by making a call to auth.info endpoint
-            headers = {
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-                "Accept": "application/json",
-            }
-            
-            # Use the API base URL from the workspace URL
-            api_base_url = f"{workspace_url}/api"
-            
-            response = requests.post(
-                f"{api_base_url}/auth.info",
-                headers=headers,
-                json={},
-                timeout=__TIMEOUT_SECONDS__,
-            )
-            
-            if response.status_code == 401:
+            # Test the API key by making a call to auth.info endpoint. Validation deliberately uses its own
+            # short-lived client instead of the runtime's pooled connections, so rejected credentials are
+            # not retried, and skips the auth info cache so revoked keys are always caught
+            with OutlineClient(api_key, workspace_url, max_retries=0) as client:
+                client.get_auth_info_uncached()
+
+        except requests.exceptions.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else None
+            if status_code == 401:
                 raise ToolProviderCredentialValidationError("Invalid API key")
-            elif response.status_code == 404:
+            elif status_code == 404:
                 raise ToolProviderCredentialValidationError("Invalid workspace URL or API not accessible")
-            elif response.status_code != 200:
-                raise ToolProviderCredentialValidationError(f"API request failed with status {response.status_code}")
-            
-            response_data = response.json()
-            if not response_data.get("ok", False):
-                error_message = response_data.get("error", "Unknown error")
-                raise ToolProviderCredentialValidationError(f"API error: {error_message}")
-                
+            else:
+                raise ToolProviderCredentialValidationError(f"API request failed with status {status_code}")
         except requests.exceptions.ConnectionError:
             raise ToolProviderCredentialValidationError("Cannot connect to workspace URL. Please check the URL is correct.")
         except requests.exceptions.Timeout:
             raise ToolProviderCredentialValidationError("Connection timeout. Please try again.")
         except requests.exceptions.RequestException as e:
             raise ToolProviderCredentialValidationError(f"Network error: {str(e)}")
+        except ValueError as e:
+            raise ToolProviderCredentialValidationError(str(e))
         except Exception as e:
             raise ToolProviderCredentialValidationError(f"Unexpected error: {str(e)}")
\ No newline at end of file